@@ -1,28 +1,68 @@
 from __future__ import annotations
-from typing import List, Union
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import io
+import logging
+import sys
+from typing import Iterator, List, Union
 from rdflib import URIRef, Namespace, Graph
+from rdflib.store import Store
 from dartfx.dcat.dcat import Catalog, Dataset, Distribution, DataService
-from .socrata import SocrataServer, SocrataDataset
+from .socrata import _DEFAULT_CONCURRENCY, SocrataServer, SocrataDataset
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    # installing pyjelly registers the "jelly" rdflib serializer plugin
+    import pyjelly  # noqa: F401
+    HAS_JELLY = True
+except ImportError:
+    HAS_JELLY = False
 
 # Extra namespaces used in Socrata DCAT
 HVDN = Namespace("https://rdf.highvaluedata.net/dcat#")
 CATALOG = Namespace("https://catalog.highvaluedata.net/")
 
+# SocrataDataset attributes used to generate DCAT resources
+_DATASET_FIELDS = (
+    "server", "landing_page", "name", "description", "tags",
+    "license_id", "license_name", "license_link", "rows_updated_at", "view_last_modified",
+    "csv_download_url", "api_endpoint_url", "api_foundry_url",
+)
+
+# Constant URIs shared by every dataset in a catalog
+_CSV_MEDIA_TYPE = URIRef("http://www.iana.org/assignments/media-types/text/csv")
+_SOCRATA_SERVICE_TYPE = URIRef("https://highvaluedata.net/vocab/service_type#SocrataOpenDataAPI")
+
+def _get_publishers(server: SocrataServer) -> list[str]:
+    """Server host URL followed by the configured publishers, without duplicates."""
+    return list(dict.fromkeys([f"https://{server.host}", *(server.publisher or [])]))
+
+def _get_spatial(server: SocrataServer) -> list[str]:
+    """Configured server spatial coverage, without duplicates."""
+    return list(dict.fromkeys(server.spatial or []))
+
 class DcatGenerator:
     """Generate DCAT metadata for Socrata datasets using official dartfx.dcat Pydantic models."""
     
     server: SocrataServer    
     datasets: list[SocrataDataset]
+    max_workers: int
     
-    def __init__(self, server: SocrataServer, datasets: list[SocrataDataset|str] = None):
+    def __init__(self, server: SocrataServer, datasets: list[SocrataDataset|str] = None, max_workers: int = None):
         """Initialize the DCAT generator.
         
         Args:
             server: The Socrata server to generate metadata for
             datasets: Optional list of datasets to include (can be SocrataDataset instances or ID strings)
+            max_workers: Maximum number of concurrent metadata requests when adding datasets by ID
         """
         self.server = server
         self.datasets = []
+        self.max_workers = max_workers or _DEFAULT_CONCURRENCY
         if datasets:
             self.add_datasets(datasets)
         
@@ -40,23 +80,74 @@ class DcatGenerator:
         Args:
             datasets: List of SocrataDataset instances or dataset ID strings
         """
+        datasets = list(datasets) # may be an iterator, it is read several times
+        # fast path: list of ready-made datasets
+        if all(type(item) is SocrataDataset for item in datasets):
+            self.datasets.extend(datasets)
+            return
         for item in datasets:
-            if isinstance(item, SocrataDataset):
-                self.datasets.append(item)
-            elif isinstance(item, str):
-                self.datasets.append(SocrataDataset(server=self.server, id=item))
-            else:
+            if not isinstance(item, (SocrataDataset, str)):
+                raise ValueError(f"Unexpected dataset type: {type(item)}")
+        # fetch metadata for dataset IDs concurrently, each dataset is created as soon as its
+        # metadata is retrieved (the bounded server memory cache may not hold all of them)
+        server = self.server
+        ids = list(dict.fromkeys(item for item in datasets if isinstance(item, str)))
+        fetched = {}
+        if ids:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ids))) as executor:
+                fetched = dict(zip(ids, executor.map(lambda dataset_id: SocrataDataset(server=server, id=dataset_id), ids)))
+        # preserve the original order
+        self.datasets.extend(fetched[item] if isinstance(item, str) else item for item in datasets)
+
+    async def add_datasets_async(self, datasets: List[Union[SocrataDataset, str]], per_host_limit: int = _DEFAULT_CONCURRENCY) -> None:
+        """Add multiple datasets to the catalog, fetching their metadata with asyncio.
+        
+        Requires the optional ``aiohttp`` package. Dataset IDs are retrieved
+        with a shared ``aiohttp.ClientSession``, with at most ``per_host_limit``
+        requests in flight against the Socrata host.
+        
+        Args:
+            datasets: List of SocrataDataset instances or dataset ID strings
+            per_host_limit: Maximum number of concurrent requests to the server
+        """
+        if aiohttp is None:
+            raise ImportError("add_datasets_async requires aiohttp (pip install dartfx-socrata[async])")
+        datasets = list(datasets) # may be an iterator, it is read several times
+        for item in datasets:
+            if not isinstance(item, (SocrataDataset, str)):
                 raise ValueError(f"Unexpected dataset type: {type(item)}")
+        ids = list(dict.fromkeys(item for item in datasets if isinstance(item, str)))
+        fetched = {}
+        if ids:
+            semaphore = asyncio.Semaphore(per_host_limit)
+            connector = aiohttp.TCPConnector(limit_per_host=per_host_limit, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(total=self.server.timeout)
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                fetched = dict(zip(ids, await asyncio.gather(*(SocrataDataset.afetch(self.server, dataset_id, session, semaphore) for dataset_id in ids))))
+        # preserve the original order
+        self.datasets.extend(fetched[item] if isinstance(item, str) else item for item in datasets)
     
-    def get_graph(self) -> Graph:
-        """Generate an RDF graph containing DCAT metadata for all datasets.
+    async def build_graph_async(self, datasets: list[SocrataDataset|str] = None, per_host_limit: int = _DEFAULT_CONCURRENCY) -> Graph:
+        """Add datasets fetching their metadata concurrently, then generate the graph.
         
-        Uses the official dartfx.dcat Pydantic models with their helper methods
-        for cleaner, more maintainable code.
+        Requires the optional ``aiohttp`` package. Dataset IDs are retrieved
+        with a shared ``aiohttp.ClientSession``, with at most ``per_host_limit``
+        requests in flight against the Socrata host.
+        
+        Args:
+            datasets: Optional list of datasets to add (SocrataDataset instances or ID strings)
+            per_host_limit: Maximum number of concurrent requests to the server
         
         Returns:
             RDFLib Graph containing the DCAT metadata
         """
+        if aiohttp is None:
+            raise ImportError("build_graph_async requires aiohttp (pip install dartfx-socrata[async])")
+        await self.add_datasets_async(datasets or [], per_host_limit=per_host_limit)
+        return self.get_graph()
+
+    def _new_catalog(self) -> Catalog:
+        """Create the catalog model holding the server level metadata."""
         # Create catalog using official dartfx.dcat model
         catalog_uri = f"https://{self.server.host}"
         catalog = Catalog(id=catalog_uri)
@@ -66,84 +157,342 @@ class DcatGenerator:
             catalog.add_title(self.server.name)
         
         # Add publishers
-        catalog.add_publisher(f"https://{self.server.host}")
-        if self.server.publisher:
-            for pub in self.server.publisher:
-                catalog.add_publisher(pub)
+        for pub in _get_publishers(self.server):
+            catalog.add_publisher(pub)
                 
         # Add spatial coverage
-        if self.server.spatial:
-            for spatial in self.server.spatial:
-                catalog.spatial.append(spatial)
-        
-        # Process each dataset
-        for socrata_ds in self.datasets:
-            # Create Dataset using official dartfx.dcat model
-            dataset = Dataset(id=socrata_ds.landing_page)
-            
-            # Add dataset metadata using helper methods
-            if socrata_ds.name:
-                dataset.add_title(socrata_ds.name)
-            
-            if socrata_ds.description:
-                dataset.add_description(socrata_ds.description)
-            
-            # Add keywords
-            if socrata_ds.tags:
-                for tag in socrata_ds.tags:
-                    dataset.add_keyword(tag)
-            
-            # Landing page
-            dataset.add_landing_page(URIRef(socrata_ds.landing_page))
-            
-            # License
-            if socrata_ds.license_id:
-                dataset.add_license(socrata_ds.license_id)
-            if socrata_ds.license_name:
-                dataset.add_license(socrata_ds.license_name)
-            if socrata_ds.license_link:
-                dataset.add_license(socrata_ds.license_link)
-            
-            # Modified date
-            if socrata_ds.rows_updated_at:
-                dataset.add_modified_date(socrata_ds.rows_updated_at)
-            elif socrata_ds.view_last_modified:
-                dataset.add_modified_date(socrata_ds.view_last_modified)
-            
-            # Publishers
-            dataset.add_publisher(f"https://{socrata_ds.server.host}")
-            if socrata_ds.server.publisher:
-                for pub in socrata_ds.server.publisher:
-                    dataset.add_publisher(pub)
-            
-            # Spatial coverage
-            if socrata_ds.server.spatial:
-                for spatial in socrata_ds.server.spatial:
-                    dataset.spatial.append(spatial)
-            
-            # Create Distribution (CSV download) using official dartfx.dcat model
-            distribution = Distribution(id=socrata_ds.csv_download_url)
-            distribution.add_download_url(URIRef(socrata_ds.csv_download_url))
-            distribution.add_media_type(URIRef("http://www.iana.org/assignments/media-types/text/csv"))
-            
-            # Add distribution to dataset
-            dataset.distribution.append(distribution)
-            
-            # Create DataService (API endpoint) using official dartfx.dcat model
-            service = DataService(id=socrata_ds.api_endpoint_url)
-            service.endpointURL.append(URIRef(socrata_ds.api_endpoint_url))
-            service.servesDataset.append(dataset)
-            
-            # Add conformance to Socrata Foundry docs
-            service.conformsTo.append(URIRef(socrata_ds.api_foundry_url))
-            
-            # Add service type
-            service_type_uri = URIRef("https://highvaluedata.net/vocab/service_type#SocrataOpenDataAPI")
-            service.type.append(service_type_uri)
-            
+        catalog.spatial.extend(_get_spatial(self.server))
+        
+        return catalog
+
+    def _materialize_soa(self, datasets: list[SocrataDataset] = None) -> dict[str, list]:
+        """Extract the dataset attributes used for DCAT generation into parallel lists.
+        
+        Each attribute is read once per dataset, and generation then works index
+        by index over the lists. The URIRef wrappers are built in bulk as
+        ``<name>_uri`` lists.
+        """
+        if datasets is None:
+            datasets = self.datasets
+        soa = {name: [getattr(socrata_ds, name) for socrata_ds in datasets] for name in _DATASET_FIELDS}
+        for name in ("landing_page", "csv_download_url", "api_endpoint_url", "api_foundry_url"):
+            soa[f"{name}_uri"] = list(map(URIRef, soa[name]))
+        # server level values are computed once per distinct server and shared
+        servers = {id(srv): (_get_publishers(srv), _get_spatial(srv)) for srv in soa["server"]}
+        soa["publishers"] = [servers[id(srv)][0] for srv in soa["server"]]
+        soa["spatial"] = [servers[id(srv)][1] for srv in soa["server"]]
+        # tags repeat across datasets
+        soa["tags"] = [[sys.intern(tag) for tag in tags] if tags else tags for tags in soa["tags"]]
+        return soa
+
+    def _get_dataset_resources(self, soa: dict[str, list], i: int) -> tuple[Dataset, DataService]:
+        """Create the DCAT dataset (with its CSV distribution) and API service for the i-th dataset."""
+        landing_page = soa["landing_page"][i]
+        name = soa["name"][i]
+        description = soa["description"][i]
+        tags = soa["tags"][i]
+        license_id = soa["license_id"][i]
+        license_name = soa["license_name"][i]
+        license_link = soa["license_link"][i]
+        modified = soa["rows_updated_at"][i] or soa["view_last_modified"][i]
+        csv_download_url = soa["csv_download_url"][i]
+        api_endpoint_url = soa["api_endpoint_url"][i]
+        
+        # Create Dataset using official dartfx.dcat model
+        dataset = Dataset(id=landing_page)
+
+        # Add dataset metadata using helper methods
+        if name:
+            dataset.add_title(name)
+
+        if description:
+            dataset.add_description(description)
+
+        # Add keywords
+        if tags:
+            for tag in tags:
+                dataset.add_keyword(tag)
+
+        # Landing page
+        dataset.add_landing_page(soa["landing_page_uri"][i])
+
+        # License
+        if license_id:
+            dataset.add_license(license_id)
+        if license_name:
+            dataset.add_license(license_name)
+        if license_link:
+            dataset.add_license(license_link)
+
+        # Modified date (rows update preferred over view modification)
+        if modified:
+            dataset.add_modified_date(modified)
+
+        # Publishers
+        for pub in soa["publishers"][i]:
+            dataset.add_publisher(pub)
+
+        # Spatial coverage
+        dataset.spatial.extend(soa["spatial"][i])
+
+        # Create Distribution (CSV download) using official dartfx.dcat model
+        distribution = Distribution(id=csv_download_url)
+        distribution.add_download_url(soa["csv_download_url_uri"][i])
+        distribution.add_media_type(_CSV_MEDIA_TYPE)
+
+        # Add distribution to dataset
+        dataset.distribution.append(distribution)
+
+        # Create DataService (API endpoint) using official dartfx.dcat model
+        service = DataService(id=api_endpoint_url)
+        service.endpointURL.append(soa["api_endpoint_url_uri"][i])
+        service.servesDataset.append(dataset)
+
+        # Add conformance to Socrata Foundry docs
+        service.conformsTo.append(soa["api_foundry_url_uri"][i])
+
+        # Add service type
+        service.type.append(_SOCRATA_SERVICE_TYPE)
+        
+        return dataset, service
+
+    def get_catalog(self) -> Catalog:
+        """Build the DCAT catalog model for all datasets.
+        
+        Uses the official dartfx.dcat Pydantic models with their helper methods
+        for cleaner, more maintainable code.
+        
+        Returns:
+            dartfx.dcat Catalog holding the datasets and their API services
+        """
+        catalog = self._new_catalog()
+        get_resources = self._get_dataset_resources
+        add_dataset = catalog.add_dataset
+        add_service = catalog.add_service
+        soa = self._materialize_soa()
+        for i in range(len(self.datasets)):
+            dataset, service = get_resources(soa, i)
             # Add dataset and service to catalog using helper methods
-            catalog.add_dataset(dataset)
-            catalog.add_service(service)
+            add_dataset(dataset)
+            add_service(service)
+        return catalog
+
+    def _get_bare_catalog_triples(self) -> set:
+        """The triples of a catalog without metadata, written once with the catalog metadata."""
+        return set(Catalog(id=f"https://{self.server.host}").to_rdf_graph())
+
+    def _get_dataset_graph(self, soa: dict[str, list], i: int, catalog_triples: set) -> Graph:
+        """Generate the triples contributed to the catalog graph by the i-th dataset."""
+        catalog = Catalog(id=f"https://{self.server.host}")
+        dataset, service = self._get_dataset_resources(soa, i)
+        catalog.add_dataset(dataset)
+        catalog.add_service(service)
+        graph = catalog.to_rdf_graph()
+        for triple in catalog_triples:
+            graph.remove(triple)
+        return graph
+
+    def _iter_graphs(self) -> Iterator[Graph]:
+        """Generate the catalog metadata graph followed by one graph per dataset."""
+        yield self._new_catalog().to_rdf_graph()
+        soa = self._materialize_soa()
+        catalog_triples = self._get_bare_catalog_triples()
+        for i in range(len(self.datasets)):
+            yield self._get_dataset_graph(soa, i, catalog_triples)
+
+    def get_graph(self, graph: Graph = None, store: str | Store = "default", store_path: str = None) -> Graph:
+        """Generate an RDF graph containing DCAT metadata for all datasets.
+        
+        This is the materializing path, meant for callers that query or combine
+        graphs. To only count or serialize the metadata, use ``count_triples``,
+        ``to_bytes`` or ``write_nt`` instead: they never build the catalog graph.
+        By default the graph is held in memory. For large catalogs, pass an
+        rdflib store plugin name (e.g. 'BerkeleyDB', or 'Oxigraph' from
+        oxrdflib) and a ``store_path``. The graph is then filled one dataset at
+        a time, and each dataset's triples go to the store in one batched
+        ``addN`` call. Stores that support transactions commit once at the end,
+        or roll back if generation fails.
+        
+        Args:
+            graph: Optional existing graph to populate
+            store: rdflib Store instance or plugin name used when creating a new graph
+            store_path: Location opened (and created if needed) by persistent stores
+        
+        Returns:
+            RDFLib Graph containing the DCAT metadata
+        """
+        if graph is None and store == "default" and store_path is None:
+            # Convert to RDF graph using the Pydantic model's built-in method
+            return self.get_catalog().to_rdf_graph()
+        if graph is None:
+            graph = Graph(store=store, identifier=URIRef(f"https://{self.server.host}"))
+            if store_path:
+                graph.open(store_path, create=True)
+        # transaction aware stores commit once for the whole catalog
+        transactional = bool(getattr(graph.store, "transaction_aware", False))
+        try:
+            for index, part in enumerate(self._iter_graphs()):
+                if index == 0:
+                    for prefix, namespace in part.namespaces():
+                        graph.bind(prefix, namespace, override=False)
+                graph.addN((s, p, o, graph) for s, p, o in part)
+        except Exception:
+            if transactional:
+                graph.rollback()
+            raise
+        if transactional:
+            graph.commit()
+        return graph
+
+    def update_graph(self, graph: Graph, changed_ids: list[str]) -> Graph:
+        """Refresh changed datasets and apply only their triple differences to a graph.
+        
+        For each changed dataset, the triples for the metadata currently held
+        by the generator are diffed against the triples for freshly retrieved
+        metadata. Removed triples are deleted from the graph and new ones added
+        in one batch, instead of regenerating the whole catalog.
+        
+        Args:
+            graph: A graph previously produced by this generator
+            changed_ids: IDs of the datasets to refresh
+        
+        Returns:
+            The updated graph
+        """
+        positions = {socrata_ds.id: i for i, socrata_ds in enumerate(self.datasets)}
+        catalog_triples = self._get_bare_catalog_triples()
+        for dataset_id in changed_ids:
+            if dataset_id not in positions:
+                raise ValueError(f"Dataset not in catalog: {dataset_id}")
+            i = positions[dataset_id]
+            old_ds = self.datasets[i]
+            old_triples = set(self._get_dataset_graph(self._materialize_soa([old_ds]), 0, catalog_triples))
+            data = old_ds.server.get_dataset_info(dataset_id, refresh=True)
+            # build from the refreshed data, the entry may already be evicted from the memory cache
+            new_ds = SocrataDataset.model_validate({"server": old_ds.server, "id": dataset_id}, context={"data": data})
+            new_triples = set(self._get_dataset_graph(self._materialize_soa([new_ds]), 0, catalog_triples))
+            self.datasets[i] = new_ds
+            for triple in old_triples - new_triples:
+                graph.remove(triple)
+            graph.addN((s, p, o, graph) for s, p, o in new_triples - old_triples)
+        return graph
+
+    def write_nt(self, fileobj, batch_size: int = 1000) -> None:
+        """Stream the DCAT metadata to a file as N-Triples.
+        
+        Unlike ``get_graph``, no graph is held for the whole catalog: the
+        catalog metadata is written first, followed by each dataset in turn.
+        The serialized datasets are joined and written in batches of
+        ``batch_size`` to limit the number of small writes, so memory use is
+        bounded by one dataset graph plus one batch of N-Triples text.
         
-        # Convert to RDF graph using the Pydantic model's built-in method
-        return catalog.to_rdf_graph()
\ No newline at end of file
+        Args:
+            fileobj: Binary file-like object receiving UTF-8 encoded N-Triples
+            batch_size: Number of serialized datasets per write
+        """
+        batch = []
+        for part in self._iter_graphs():
+            batch.append(part.serialize(format="nt", encoding="utf-8"))
+            if len(batch) >= batch_size:
+                fileobj.write(b"".join(batch))
+                batch.clear()
+        if batch:
+            fileobj.write(b"".join(batch))
+
+    def write_ttl(self, fileobj) -> None:
+        """Stream the DCAT metadata to a file as Turtle.
+        
+        Like ``write_nt``, the catalog metadata and then each dataset are
+        serialized in turn, without building the catalog graph. Each part is
+        written as a Turtle block. Prefix declarations already written by an
+        earlier block are not repeated.
+        
+        Args:
+            fileobj: Binary file-like object receiving UTF-8 encoded Turtle
+        """
+        declared = set()
+        for part in self._iter_graphs():
+            lines = []
+            for line in part.serialize(format="turtle", encoding="utf-8").splitlines(keepends=True):
+                if line.startswith(b"@prefix "):
+                    if line in declared:
+                        continue
+                    declared.add(line)
+                lines.append(line)
+            fileobj.write(b"".join(lines))
+
+    def serialize_ttl(self, destination=None) -> bytes | None:
+        """Serialize the DCAT metadata to Turtle with ``write_ttl``.
+        
+        Args:
+            destination: Optional file path or binary file object. When omitted,
+                the serialized bytes are returned.
+        
+        Returns:
+            The serialized bytes, or None if a destination was given
+        """
+        if destination is None:
+            buffer = io.BytesIO()
+            self.write_ttl(buffer)
+            return buffer.getvalue()
+        if hasattr(destination, "write"):
+            self.write_ttl(destination)
+        else:
+            with open(destination, "wb") as f:
+                self.write_ttl(f)
+        return None
+
+    def count_triples(self) -> int:
+        """Return the number of triples in the catalog without building the catalog graph.
+        
+        Triples emitted for several datasets (e.g. a shared publisher) are
+        counted once, as in ``get_graph``.
+        """
+        triples = set()
+        for part in self._iter_graphs():
+            triples.update(part)
+        return len(triples)
+
+    def to_bytes(self, format: str = "nt") -> bytes:
+        """Return the serialized DCAT metadata. N-Triples is streamed without building the catalog graph."""
+        return self.serialize(format=format)
+
+    def serialize(self, format: str = "jelly", destination=None) -> bytes | None:
+        """Serialize the DCAT metadata.
+        
+        The default Jelly binary format is compact and fast to write and read. It
+        requires the optional ``pyjelly`` package; without it the output falls
+        back to N-Triples. N-Triples is streamed with ``write_nt``. Other formats
+        go through ``get_graph``.
+        
+        For catalogs produced dataset by dataset, prefer a streamed format
+        (N-Triples, or Jelly in its streaming mode) over Turtle or RDF/XML. Those
+        formats need the complete graph in memory.
+        
+        Args:
+            format: Any rdflib serializer format name (e.g. 'jelly', 'nt', 'ttl')
+            destination: Optional file path or binary file object. When omitted,
+                the serialized bytes are returned.
+        
+        Returns:
+            The serialized bytes, or None if a destination was given
+        """
+        if format == "jelly" and not HAS_JELLY:
+            logging.debug("pyjelly is not installed, serializing to N-Triples")
+            format = "nt"
+        if format in ("nt", "ntriples", "nt11"):
+            if destination is None:
+                buffer = io.BytesIO()
+                self.write_nt(buffer)
+                return buffer.getvalue()
+            if hasattr(destination, "write"):
+                self.write_nt(destination)
+            else:
+                with open(destination, "wb") as f:
+                    self.write_nt(f)
+            return None
+        graph = self.get_graph()
+        if destination is None:
+            return graph.serialize(format=format, encoding="utf-8")
+        graph.serialize(destination=destination, format=format, encoding="utf-8")
+        return None
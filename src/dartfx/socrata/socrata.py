@@ -1,18 +1,95 @@
-from dataclasses import field
+import asyncio
+from collections import OrderedDict
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import cached_property, lru_cache
+from itertools import compress, islice
 import json
 import logging
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, PackageLoader
 from markdownify import markdownify
 import mlcroissant as mlc
 import os
-from pydantic import BaseModel, Field, PrivateAttr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+from typing import Any, Optional
 import requests
-from xml.sax.saxutils import escape
+import shutil
+import tempfile
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import xml.etree.ElementTree as ET
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+def _run_async(coro):
+    """Runs a coroutine in a new event loop, using uvloop when available."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+def _json_loads(content: bytes):
+    """Parses JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _json_dumps(data) -> bytes:
+    """Serializes to compact JSON bytes (the disk cache is machine read), using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+@contextmanager
+def _atomic_open(file_path):
+    """Opens a unique temporary file next to file_path for writing, which replaces file_path once closed.
+
+    An interrupted write never leaves a truncated file, and concurrent writers do not interleave.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+# templates are packaged and never change at runtime, compile each once and skip the source up-to-date checks
+jinja_env = Environment(loader=PackageLoader("dartfx.socrata", "templates"), auto_reload=False, autoescape=False) # code, not HTML
+# environment name -> template file, resolved once instead of stat-ing the file on every get_code call
+_CODE_TEMPLATES = {
+    filename[len("generate_"):-len(".j2")]: filename
+    for filename in jinja_env.list_templates(filter_func=lambda name: name.startswith("generate_") and name.endswith(".j2"))
+}
+
+@lru_cache(maxsize=128)
+def _render_code(template_file, host, dataset_id) -> str:
+    # the templates only depend on the host and dataset id, so renders without options are memoized
+    return jinja_env.get_template(template_file).render({"host": host, "dataset_id": dataset_id, "options": None})
 
+# default number of concurrent requests against a host for the asyncio retrievals
+_DEFAULT_CONCURRENCY = 16
 
-jinja_env = Environment(loader=FileSystemLoader(os.path.join(os.path.dirname(os.path.abspath(__file__)),'templates')))
+# serialized size (bytes) above which in-memory cache entries are compressed, when enabled
+_CACHE_COMPRESS_THRESHOLD = 16 * 1024
 
 class SocrataApiError(Exception):
     """Custom exception for Socrata API errors."""
@@ -87,17 +164,60 @@ SERVERS = {
     }
 }
 
+def _create_session() -> requests.Session:
+    """Creates a pooled HTTP session that retries transient errors and honors Retry-After headers."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], respect_retry_after_header=True, raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry))
+    return session
+
+# SocrataServer private attributes holding per instance resources, which are not
+# copied or pickled but created anew
+_SERVER_RESOURCES = {"_cache_lock": threading.Lock, "_session": _create_session}
+
+class CatalogEntry(BaseModel):
+    """A dataset entry returned by the Socrata Discovery API."""
+    model_config = ConfigDict(extra="allow")
+    resource: dict = Field(default_factory=dict)
+    classification: dict = Field(default_factory=dict)
+    metadata: dict = Field(default_factory=dict)
+    permalink: str | None = None
+    link: str | None = None
+
+class CatalogResults(BaseModel):
+    """The Socrata Discovery API search results."""
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+    results: list[CatalogEntry] = Field(default_factory=list)
+    result_set_size: int | None = Field(default=None, alias="resultSetSize")
+
 class SocrataServer(BaseModel):
     host: str
     name: str | None = Field(default=None)
     disk_cache_root: str | None = Field(default=None) # a directory will be created here for this server
-    _in_memory_cache: dict = PrivateAttr(default_factory=dict)
+    disk_cache_revalidate: bool = Field(default=False) # check disk cache entries with a conditional request
+    timeout: float | None = Field(default=30) # seconds
+    offline: bool = Field(default=False) # only use the memory/disk caches, never call the API
+    cache_max_items: int | None = Field(default=256) # in-memory cache capacity (least recently used are evicted), None for unbounded
+    cache_compress: bool = Field(default=False) # keep large in-memory cache entries as compressed JSON
+    _in_memory_cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _cache_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock) # the cache is shared by the fetch threads
+    _session: requests.Session = PrivateAttr(default_factory=_create_session)
+    _api_base: str = PrivateAttr(default="")
+    _disk_cache_dir: str | None = PrivateAttr(default=None)
+    _publisher_orgs: list = PrivateAttr(default_factory=list) # Croissant publishers, shared by all datasets
     
     # attributes not available in Dataset metadata
     publisher: Optional[list[str]] = field(default_factory=list)
     spatial: Optional[list[str]] = field(default_factory=list)
 
     def model_post_init(self, __context):
+        self._api_base = f"https://{self.host}/api/views/"
+        # resolve the disk cache directory once
+        if self.disk_cache_root:
+            if not os.path.isdir(self.disk_cache_root):
+                raise ValueError(f"Cache root directory does not exist: {self.disk_cache_root}")
+            self._disk_cache_dir = os.path.join(self.disk_cache_root, self.host)
+            os.makedirs(self._disk_cache_dir, exist_ok=True)
         # set metadata for know servers
         if self.host in SERVERS:
             self.name = SERVERS[self.host].get("name",self.host)
@@ -106,17 +226,32 @@ class SocrataServer(BaseModel):
         else:
             self.name = self.host
             self.publisher = [self.host_url]
+        self._publisher_orgs = [mlc.Organization(name=publisher, url=self.host) for publisher in self.publisher]
+
+    def __eq__(self, other):
+        # servers are equal when configured alike, their caches and HTTP sessions are not compared
+        if not isinstance(other, SocrataServer):
+            return NotImplemented
+        return self.__dict__ == other.__dict__
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {key: value for key, value in state["__pydantic_private__"].items() if key not in _SERVER_RESOURCES}
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        for name, factory in _SERVER_RESOURCES.items():
+            setattr(self, name, factory())
+
+    def __deepcopy__(self, memo=None):
+        copied = self.__class__.__new__(self.__class__)
+        copied.__setstate__(copy.deepcopy(self.__getstate__(), memo))
+        return copied
 
     @property
     def disk_cache_dir(self):
-        if self.disk_cache_root:
-            if os.path.isdir(self.disk_cache_root):
-                if self.disk_cache_root:
-                    path = os.path.join(self.disk_cache_root, self.host)
-                    os.makedirs(path, exist_ok=True)
-                    return path
-            else:
-                raise ValueError(f"Cache root directory does not exist: {self.disk_cache_root}")
+        return self._disk_cache_dir
 
     @property
     def memory_cache(self):
@@ -127,47 +262,202 @@ class SocrataServer(BaseModel):
         return f"https://{self.host}"
     
     def get_dataset_info(self, dataset_id, refresh=False):
-        # check if in memory cache
-        if dataset_id in self.memory_cache and not refresh:
-            return self.memory_cache[dataset_id]
-        # init local file if cache is enabled
-        file_name = f"{dataset_id}.json"
-        if self.disk_cache_dir:
-            file_path = os.path.join(self.disk_cache_dir, file_name)
-        if self.disk_cache_dir and os.path.isfile(file_path) and not refresh:
-            # load from disk cache
-            logging.debug(f"Loading from disk cache {file_path}")
-            with open(file_path) as f:
-                data = json.load(f)
-                self.memory_cache[dataset_id] = data
-                return data
-        else:
-            # retrieve from server
-            url = f"https://{self.host}/api/views/{file_name}"
-            results = requests.get(url)
-            if results.status_code == 200:
-                data = results.json()
-                # save to disk cache if enabled
-                if self.disk_cache_dir: # save to local cache if enabled
-                    with open(file_path, 'w') as f:
-                        json.dump(data, f, indent=4)
-                # save to in memory cache
-                self.memory_cache[dataset_id] = data
+        data, file_path, headers = self._lookup_caches(dataset_id, refresh)
+        if data is not None:
+            return data
+        # retrieve from server
+        url = f"{self._api_base}{dataset_id}.json"
+        with self._session.get(url, headers=headers, timeout=self.timeout, stream=True) as results:
+            if results.status_code == 304:
+                logging.debug(f"Disk cache is current for {dataset_id}")
+                return self._load_disk_cache(dataset_id, file_path)
+            elif results.status_code == 200:
+                if file_path:
+                    # stream the body straight to the disk cache rather than buffering it
+                    self._stream_to_disk_cache(results, file_path)
+                    self._save_validators(dataset_id, results.headers)
+                    return self._load_disk_cache(dataset_id, file_path)
+                data = _json_loads(results.content)
+                self._save_dataset_info(dataset_id, data, results.headers)
                 return data
             else:
                 raise SocrataApiError("Error getting dataset info", url, results.status_code, results.text)
-        return
+
+    def get_dataset_infos(self, dataset_ids, refresh=False, max_workers=16) -> dict:
+        """Retrieves the information for several datasets concurrently.
+
+        Requests share the server HTTP connection pool. Cached datasets are
+        returned directly without using the thread pool.
+
+        Returns:
+            dict: dataset info keyed by dataset id, in the order of dataset_ids
+        """
+        dataset_ids = list(dict.fromkeys(dataset_ids))
+        infos = {}
+        pending = []
+        for dataset_id in dataset_ids:
+            if not refresh and (data := self._cache_get(dataset_id)) is not None:
+                infos[dataset_id] = data
+            else:
+                pending.append(dataset_id)
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                infos.update(zip(pending, executor.map(lambda dataset_id: self.get_dataset_info(dataset_id, refresh), pending)))
+        return {dataset_id: infos[dataset_id] for dataset_id in dataset_ids}
+
+    async def aget_dataset_info(self, dataset_id, session, semaphore, refresh=False, retries=3):
+        """Asynchronous version of get_dataset_info using an aiohttp session.
+
+        The memory and disk caches are shared with get_dataset_info. The semaphore
+        bounds the number of requests in flight against this host, and HTTP 429
+        responses are retried after the delay given in their Retry-After header.
+
+        Raises:
+            SocrataApiError: Error when calling the API
+        """
+        data, file_path, headers = self._lookup_caches(dataset_id, refresh)
+        if data is not None:
+            return data
+        url = f"{self._api_base}{dataset_id}.json"
+        for attempt in range(retries + 1):
+            async with semaphore:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        return self._load_disk_cache(dataset_id, file_path)
+                    elif response.status == 200:
+                        data = _json_loads(await response.read())
+                        self._save_dataset_info(dataset_id, data, response.headers)
+                        return data
+                    elif response.status != 429 or attempt == retries:
+                        raise SocrataApiError("Error getting dataset info", url, response.status, await response.text())
+                    try:
+                        delay = float(response.headers.get("Retry-After", 1))
+                    except ValueError:
+                        delay = 1
+            logging.debug(f"Rate limited on {url}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+    async def aget_all(self, dataset_ids, concurrency=_DEFAULT_CONCURRENCY, refresh=False) -> dict:
+        """Retrieves the information for several datasets concurrently using asyncio.
+
+        Requires the optional ``aiohttp`` package. All requests share one
+        session, with at most ``concurrency`` of them in flight.
+
+        Returns:
+            dict: dataset info keyed by dataset id, in the order of dataset_ids
+        """
+        if aiohttp is None:
+            raise ImportError("aget_all requires aiohttp (pip install dartfx-socrata[async])")
+        dataset_ids = list(dict.fromkeys(dataset_ids))
+        semaphore = asyncio.Semaphore(concurrency)
+        connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            infos = await asyncio.gather(*(self.aget_dataset_info(dataset_id, session, semaphore, refresh) for dataset_id in dataset_ids))
+        return dict(zip(dataset_ids, infos))
+
+    def bulk_fetch(self, dataset_ids, concurrency=_DEFAULT_CONCURRENCY, refresh=False) -> dict:
+        """Synchronous entry point for aget_all, runs it in a new (uvloop if installed) event loop."""
+        return _run_async(self.aget_all(dataset_ids, concurrency=concurrency, refresh=refresh))
+
+    def _lookup_caches(self, dataset_id, refresh):
+        # shared by get_dataset_info and aget_dataset_info, returns (data, file_path, headers):
+        # the cached data when no request is needed, else the disk cache path and the request headers
+        if not refresh and (data := self._cache_get(dataset_id)) is not None:
+            return data, None, None
+        # init local file if cache is enabled
+        file_name = f"{dataset_id}.json"
+        headers = {}
+        cache_dir = self._disk_cache_dir
+        file_path = os.path.join(cache_dir, file_name) if cache_dir else None
+        if file_path and (not refresh or self.offline) and os.path.isfile(file_path):
+            if self.offline or not self.disk_cache_revalidate:
+                return self._load_disk_cache(dataset_id, file_path), None, None
+            headers = self._get_conditional_headers(dataset_id)
+        elif self.offline:
+            raise SocrataApiError(f"Dataset {dataset_id} is not cached and the server is offline", self._api_base + file_name)
+        return None, file_path, headers
+
+    def _get_conditional_headers(self, dataset_id) -> dict:
+        # conditional request using the validators saved with the cached copy
+        headers = {}
+        validators_path = os.path.join(self.disk_cache_dir, f"{dataset_id}.validators.json")
+        if os.path.isfile(validators_path):
+            with open(validators_path, 'rb') as f:
+                validators = _json_loads(f.read())
+            if validators.get("ETag"):
+                headers["If-None-Match"] = validators["ETag"]
+            if validators.get("Last-Modified"):
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+        return headers
+
+    def _save_dataset_info(self, dataset_id, data, headers):
+        # save to disk cache if enabled
+        if self.disk_cache_dir: # save to local cache if enabled
+            with _atomic_open(os.path.join(self.disk_cache_dir, f"{dataset_id}.json")) as f:
+                f.write(_json_dumps(data))
+            self._save_validators(dataset_id, headers)
+        # save to in memory cache
+        self._cache_put(dataset_id, data)
+
+    def _save_validators(self, dataset_id, headers):
+        # keep the response validators next to the cached copy for conditional requests
+        validators = {key: headers[key] for key in ("ETag", "Last-Modified") if key in headers}
+        with _atomic_open(os.path.join(self.disk_cache_dir, f"{dataset_id}.validators.json")) as f:
+            f.write(_json_dumps(validators))
+
+    def _stream_to_disk_cache(self, response, file_path):
+        response.raw.decode_content = True # undo gzip/deflate content encoding
+        with _atomic_open(file_path) as f:
+            shutil.copyfileobj(response.raw, f, length=65536)
+
+    def _cache_get(self, dataset_id):
+        # in-memory LRU lookup, marks the entry as most recently used
+        with self._cache_lock:
+            data = self._in_memory_cache.get(dataset_id)
+            if data is not None:
+                self._in_memory_cache.move_to_end(dataset_id)
+        if isinstance(data, bytes):
+            data = _json_loads(zlib.decompress(data))
+        return data
+
+    def _cache_put(self, dataset_id, data):
+        # in-memory LRU insert, evicts the least recently used entries beyond capacity
+        cache = self._in_memory_cache
+        if self.cache_compress:
+            content = _json_dumps(data)
+            if len(content) > _CACHE_COMPRESS_THRESHOLD:
+                data = zlib.compress(content, 1)
+        with self._cache_lock:
+            cache[dataset_id] = data
+            cache.move_to_end(dataset_id)
+            if self.cache_max_items is not None:
+                while len(cache) > self.cache_max_items:
+                    cache.popitem(last=False)
+
+    def _load_disk_cache(self, dataset_id, file_path):
+        # load from disk cache
+        logging.debug(f"Loading from disk cache {file_path}")
+        with open(file_path, 'rb') as f:
+            data = _json_loads(f.read())
+            self._cache_put(dataset_id, data)
+            return data
     
-    def search_datasets(self, limit:int=None, offset:int = None, order:str = None, sort_order:str = None):
+    def search_datasets(self, limit:int=None, offset:int = None, order:str = None, sort_order:str = None, as_model:bool = False):
         """Calls the Socrata Discovery API
 
         See https://dev.socrata.com/docs/other/discovery
 
+        The response is returned as a dict, or when as_model is set, parsed
+        and validated straight from the response bytes into CatalogResults.
+
         Raises:
             SocrataApiError: Error when calling the API
         """
         # use search_context= , not domain=
         url = f"https://{self.host}/api/catalog/v1?search_context={self.host}&only=datasets"
+        if self.offline:
+            raise SocrataApiError("Search is not available when the server is offline", url)
         if limit:
             url += f"&limit={limit}"
         if offset:
@@ -183,35 +473,112 @@ class SocrataServer(BaseModel):
                     raise SocrataApiError("sort_order must be 'asc' or 'desc'")
                 url += f"+{sort_order}"
         logging.debug(f"Calling {url}")
-        results = requests.get(url)
+        results = self._session.get(url, timeout=self.timeout)
         if results.status_code == 200:
-            data = results.json()
+            if as_model:
+                return CatalogResults.model_validate_json(results.content)
+            data = _json_loads(results.content)
             return(data)
         else:
             raise SocrataApiError("Search error", url, results.status_code, results.text)
         
     
+# The view models only keep the attributes used by the generators, the other
+# (often large) view properties are not copied. The raw JSON remains available
+# from SocrataDataset.data.
+class SocrataCachedContents(BaseModel):
+    """Typed view of a column 'cachedContents' (descriptive statistics)."""
+    model_config = ConfigDict(extra="ignore")
+
+    cardinality: int | None = None
+    count: int | None = None
+    largest: Any = None
+    non_null: int | None = None
+    null: int | None = None
+    smallest: Any = None
+    top: list[dict] | None = None
+
+class SocrataColumn(BaseModel):
+    """Typed view of a Socrata view column."""
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+
+    id: int
+    name: str
+    field_name: str = Field(alias="fieldName")
+    position: int | None = None
+    data_type_name: str = Field(alias="dataTypeName")
+    render_type_name: str | None = Field(default=None, alias="renderTypeName")
+    description: str | None = None
+    cached_contents: SocrataCachedContents | None = Field(default=None, alias="cachedContents")
+
+class SocrataView(BaseModel):
+    """Typed view of the Socrata view metadata (/api/views/<id>.json)."""
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+
+    id: str | None = None
+    name: str | None = None
+    description: str | None = None
+    asset_type: str | None = Field(default=None, alias="assetType")
+    license_id: str | None = Field(default=None, alias="licenseId")
+    license: dict | None = None
+    publication_date: int | None = Field(default=None, alias="publicationDate")
+    rows_updated_at: int | None = Field(default=None, alias="rowsUpdatedAt")
+    view_last_modified: int | None = Field(default=None, alias="viewLastModified")
+    tags: list[str] | None = None
+    columns: list[SocrataColumn] = Field(default_factory=list)
+
+
 class SocrataDataset(BaseModel):
     server: SocrataServer
     id: str
     _data: dict|None = None
+    _view: SocrataView|None = None
     _variables: list["SocrataVariable"] = PrivateAttr(default_factory=list)
+    # column attributes as parallel lists (indexed by variable index)
+    _col_name: list[str] = PrivateAttr(default_factory=list)
+    _col_label: list[str] = PrivateAttr(default_factory=list)
+    _col_type: list[str|None] = PrivateAttr(default_factory=list)
+    _col_cached: list[SocrataCachedContents|None] = PrivateAttr(default_factory=list)
+    # column visibility masks
+    _is_computed: list[bool] = PrivateAttr(default_factory=list)
+    _is_deleted: list[bool] = PrivateAttr(default_factory=list)
+    _is_hidden: list[bool] = PrivateAttr(default_factory=list)
 
     def model_post_init(self, __context):
-        self._data = self.server.get_dataset_info(self.id)
+        # the metadata may already be retrieved and passed in the validation context (see afetch)
+        self._data = __context.get("data") if __context else None
+        if self._data is None:
+            self._data = self.server.get_dataset_info(self.id)
+        # parse and validate once, properties then read typed attributes
+        self._view = SocrataView.model_validate(self._data)
         if self.asset_type != 'dataset':
             raise ValueError(f"Unexpected asset type: {self.asset_type}. Must be 'dataset'.")
-
-    @property
+        columns = self._view.columns
+        self._col_name = [column.field_name for column in columns]
+        self._col_label = [column.name for column in columns]
+        self._col_type = [column.data_type_name for column in columns]
+        self._col_cached = [column.cached_contents for column in columns]
+        self._is_computed = [name.startswith(":@computed") for name in self._col_name]
+        self._is_deleted = [label.startswith("DELETE -") for label in self._col_label]
+        self._is_hidden = [computed or deleted for computed, deleted in zip(self._is_computed, self._is_deleted)]
+
+    @classmethod
+    async def afetch(cls, server: SocrataServer, id: str, session, semaphore) -> "SocrataDataset":
+        """Retrieves the dataset metadata asynchronously (see SocrataServer.aget_dataset_info)."""
+        data = await server.aget_dataset_info(id, session, semaphore)
+        # build from the retrieved data, the entry may already be evicted from the memory cache
+        return cls.model_validate({"server": server, "id": id}, context={"data": data})
+
+    @cached_property
     def api_foundry_url(self):
         return f"https://dev.socrata.com/foundry/{self.server.host}/{self.id}"
 
-    @property
+    @cached_property
     def api_endpoint_url(self):
         return f"https://{self.server.host}/resource/{self.id}.json"
 
 
-    @property   
+    @cached_property
     def csv_download_url(self):
         return f"https://{self.server.host}/resource/{self.id}.csv"
 
@@ -221,13 +588,19 @@ class SocrataDataset(BaseModel):
 
     @property
     def asset_type(self):
-        return self._data.get("assetType")
+        return self._view.asset_type
 
     @property
     def description(self):
-        return self._data.get("description")
+        return self._view.description
 
-    @property
+    @cached_property
+    def description_md(self) -> str|None:
+        """The description converted from HTML to Markdown"""
+        if self.description:
+            return markdownify(self.description)
+
+    @cached_property
     def landing_page(self):
         #category = self._data.get("category").replace(" ", "-")
         #name = self._data.get("name").replace(" ", "-")
@@ -246,91 +619,84 @@ class SocrataDataset(BaseModel):
 
     @property
     def license_id(self):
-        if self._data.get("licenseId"):
-            return self._data.get("licenseId")
+        if self._view.license_id:
+            return self._view.license_id
         
     @property
     def license_name(self):
-        if self._data.get("license"):
-            return self._data["license"].get("name")
+        if self._view.license:
+            return self._view.license.get("name")
         
     @property
     def license_link(self):
-        if self._data.get("license"):
-            return self._data["license"].get("termsLink")
+        if self._view.license:
+            return self._view.license.get("termsLink")
 
-    @property
+    @cached_property
     def name(self):
-        return self._data.get("name")
+        return self._view.name
 
-    @property
+    @cached_property
+    def name_md(self) -> str:
+        """The name converted from HTML to Markdown"""
+        return markdownify(self.name)
+
+    @cached_property
     def publication_date(self) -> datetime|None:
-        if self._data.get("publicationDate"):
-            return datetime.fromtimestamp(self._data.get("publicationDate"))
+        if self._view.publication_date:
+            return datetime.fromtimestamp(self._view.publication_date)
 
-    @property
+    @cached_property
     def rows_updated_at(self) -> datetime|None:
-        if self._data.get("rowsUpdatedAt"):
-            return datetime.fromtimestamp(self._data.get("rowsUpdatedAt"))
+        if self._view.rows_updated_at:
+            return datetime.fromtimestamp(self._view.rows_updated_at)
 
     @property
     def tags(self):
-        return self._data.get("tags")
+        return self._view.tags
     
     @property
     def variables(self) -> list["SocrataVariable"]:
         if not self._variables:
-            self._variables = []
-            for index, column in enumerate(self._data["columns"]):
-                self._variables.append(SocrataVariable(dataset=self, index=index))
+            self._variables = [SocrataVariable(self, index) for index in range(len(self._view.columns))]
         return self._variables
 
-    @property
+    @cached_property
     def view_last_modified(self) -> datetime|None:
-        if self._data:
-            if self._data.get("viewLastModified"):
-                return datetime.fromtimestamp(self._data["viewLastModified"])
+        if self._view:
+            if self._view.view_last_modified:
+                return datetime.fromtimestamp(self._view.view_last_modified)
 
     def get_code(self, environment, options: dict = None, *args, **kwargs) -> str:
         """Generates code/script for a given environment.
         """
-        code = None
-        template_file = f"generate_{environment}.j2"
-        template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", template_file)
-        if os.path.isfile(template_path):
-            template = jinja_env.get_template(template_file)
-            code = template.render(host=self.server.host, dataset_id=self.id, options=options)
-        else: 
+        template_file = _CODE_TEMPLATES.get(environment)
+        if template_file is None:
             raise ValueError(f"Unsupported environment: {environment}.")
-        return code
+        if options is None:
+            return _render_code(template_file, self.server.host, self.id)
+        template = jinja_env.get_template(template_file)
+        return template.render({"host": self.server.host, "dataset_id": self.id, "options": options})
 
     def get_croissant(self, include_computed=False, include_codes=True, max_codes=100) -> mlc.Metadata:
         context = mlc.Context()
         context.is_live_dataset = True
         # selected variables
-        selected_variables = []
-        selected_variables_names = []
-        for variable in self.variables:
-            if variable.is_deleted:
-                continue
-            if variable.is_computed and not include_computed:
-                continue
-            selected_variables.append(variable)
-            selected_variables_names.append(variable.name)
+        selected_variables = self.get_variables(exclude_hidden=False, exclude_computed=not include_computed)
+        selected_variables_names = [variable.name for variable in selected_variables]
         # metadata
-        publishers = []
-        for publisher in self.server.publisher:
-            publishers.append(mlc.Organization(name=publisher, url=self.server.host))
+        publishers = list(self.server._publisher_orgs)
+        rows_updated_at = self.rows_updated_at
         metadata = mlc.Metadata(ctx=context, 
             id=self.id,
             name=self.name,
-            description=markdownify(self.description) if self.description else None,
+            description=self.description_md,
             cite_as = f'{self.name}, {self.server.name}, {self.landing_page}',
-            date_modified = self.rows_updated_at,
+            date_modified = rows_updated_at,
             date_published = self.publication_date,
             license = self.license,
             publisher=publishers,
-            version = int(self.rows_updated_at.timestamp())
+            version = int(rows_updated_at.timestamp()) if rows_updated_at else None
         )
         # distribution
         distribution = []
@@ -346,22 +712,25 @@ class SocrataDataset(BaseModel):
         distribution.append(csv_file)
         metadata.distribution = distribution
         # fields and record set
-        fields = []
+        csv_file_id = csv_file.id
+        fields = [None] * len(selected_variables)
         classifications_record_sets = []
-        for variable in selected_variables:
+        for index, variable in enumerate(selected_variables):
+            name = variable.name
             field = mlc.Field(ctx=context,
-                id=variable.name,
-                name=variable.name,
+                id=name,
+                name=name,
                 description=variable.label,
-                source=mlc.Source(file_object=csv_file.id, extract=mlc.Extract(ctx=context, column=variable.name))
+                source=mlc.Source(file_object=csv_file_id, extract=mlc.Extract(ctx=context, column=name))
             )
             field.data_types.append(variable.croissant_data_type)
-            fields.append(field)
+            fields[index] = field
             # classifications
             if include_codes:
                 if variable.cached_content: # we have statistics
-                    if variable.top: # we have top codes
-                        classification_id = f"{variable.name}_codes"
+                    top = variable.top
+                    if top: # we have top codes
+                        classification_id = f"{name}_codes"
                         value_field_id = f"{classification_id}/value"
                         freq_field_id = f"{classification_id}/freq"
                         classification_fields = [
@@ -369,19 +738,13 @@ class SocrataDataset(BaseModel):
                             mlc.Field(ctx=context, id=freq_field_id, name="freq", description="Code frequency"),
                         ]
                         # codes
-                        classification_records = []
-                        code_count = 0
-                        for code in variable.top:
-                            code_count += 1
-                            classification_records.append({
-                                value_field_id: str(code.get("item")),
-                                freq_field_id: code.get("count")
-                            })
-                            if code_count >= max_codes:
-                                break
+                        classification_records = [
+                            {value_field_id: str(code.get("item")), freq_field_id: code.get("count")}
+                            for code in islice(top, max_codes)
+                        ]
                         # create record set
                         classification_record_set = mlc.RecordSet(id=classification_id, fields=classification_fields)
-                        classification_record_set.description = f"Top {min(len(variable.top), max_codes)} values and frequencies for {field.name}."
+                        classification_record_set.description = f"Top {min(len(top), max_codes)} values and frequencies for {field.name}."
                         if variable.cardinality and variable.cardinality <= max_codes:
                             # complete data
                             classification_record_set.data = classification_records
@@ -411,109 +774,115 @@ class SocrataDataset(BaseModel):
         Returns:
             str: XML codebook
         """
+        # unqualified tags with a default namespace declaration, serialized as is
+        codebook = self._build_ddi_codebook(category_count_threshold, codebook_version, qualified=False)
+        return ET.tostring(codebook, encoding="unicode", short_empty_elements=False)
+
+    def get_ddi_codebook_element(self, category_count_threshold=500, codebook_version="2.5") -> ET.Element:
+        """Generate the DDI-Codebook for this dataset as an ElementTree element.
+
+        Useful to further process the codebook without serializing and parsing it again.
+        The element tags are qualified with the DDI-Codebook namespace (e.g.
+        ``{ddi:codebook:2_5}var``).
+
+        Returns:
+            xml.etree.ElementTree.Element: codeBook element
+        """
+        return self._build_ddi_codebook(category_count_threshold, codebook_version, qualified=True)
+
+    def _build_ddi_codebook(self, category_count_threshold, codebook_version, qualified) -> ET.Element:
+        # the element tree is namespace qualified, or uses bare tags with an xmlns attribute
+        # (ElementTree cannot serialize qualified tags with unqualified attributes to a default namespace)
+        namespace = f'ddi:codebook:{codebook_version.replace(".", "_")}'
         uid = f"socrata_{self.server.host}_{self.id}"
         urn = f"urn:socrata:{self.server.host}:{self.id}"
-        xml = f'<codeBook ID="{uid}" ddiCodebookUrn="{urn}" version="{codebook_version}" xmlns="ddi:codebook:{codebook_version.replace(".", "_")}">'
+        idno = f"{self.server.host}-{self.id}"
+        ns = f"{{{namespace}}}" if qualified else ""
+        def _sub(parent, tag, attrib=None):
+            return ET.SubElement(parent, ns + tag, attrib or {})
+        codebook = ET.Element(ns + "codeBook", {"ID": uid, "ddiCodebookUrn": urn, "version": codebook_version})
+        if not qualified:
+            codebook.set("xmlns", namespace)
         # docDscr
-        xml += '<docDscr>'
-        xml += '<citation>'
-        xml += '<titlStmt>'
-        xml += f'<titl>{escape(self.name)}</titl>'
-        xml += f'<IDNo agency="socrata.com">{self.server.host}-{self.id}</IDNo>'
-        xml += '</titlStmt>'
-        xml += '<prodStmt>'
+        citation = _sub(_sub(codebook, "docDscr"), "citation")
+        titlStmt = _sub(citation, "titlStmt")
+        _sub(titlStmt, "titl").text = self.name
+        _sub(titlStmt, "IDNo", {"agency": "socrata.com"}).text = idno
+        prodStmt = _sub(citation, "prodStmt")
         prodDate = datetime.now().isoformat()[:-7]
-        xml += f'<prodDate date="{prodDate}">{prodDate}</prodDate>'
-        xml += '<software version="0.1.0">Data Artifex - Socrata (dartfx-socrata)</software>'
-        xml += '</prodStmt>'
-        xml += '</citation>'
-        xml += '</docDscr>'
+        _sub(prodStmt, "prodDate", {"date": prodDate}).text = prodDate
+        _sub(prodStmt, "software", {"version": "0.1.0"}).text = "Data Artifex - Socrata (dartfx-socrata)"
         # stdyDscr
-        xml += '<stdyDscr>'
-        xml += '<citation>'
-        xml += '<titlStmt>'
-        xml += f'<titl>{escape(self.name)}</titl>'
-        xml += f'<IDNo agency="socrata.com">{self.server.host}-{self.id}</IDNo>'
-        xml += '</titlStmt>'
-        xml += '<prodStmt>'
-        xml += '<software>Socrata</software>'
-        xml += '</prodStmt>'
-        xml += '</citation>'
+        stdyDscr = _sub(codebook, "stdyDscr")
+        citation = _sub(stdyDscr, "citation")
+        titlStmt = _sub(citation, "titlStmt")
+        _sub(titlStmt, "titl").text = self.name
+        _sub(titlStmt, "IDNo", {"agency": "socrata.com"}).text = idno
+        _sub(_sub(citation, "prodStmt"), "software").text = "Socrata"
         if self.description:
-            xml += '<stdyInfo>'
-            xml += f'<abstract><![CDATA[{escape(self.description)}]]></abstract>'
-            xml += '</stdyInfo>'
-        xml += '</stdyDscr>'
+            _sub(_sub(stdyDscr, "stdyInfo"), "abstract").text = self.description
         # fileDscr
-        xml += '<fileDscr ID="F1">'
-        xml += '<fileTxt>'
-        xml += f'<fileName>{self.name}</fileName>'
-        xml += '<dimensns>'
-        xml += f'<caseQnty>{self.get_record_count()}</caseQnty>'
-        xml += f'<varQnty>{self.get_variable_count()}</varQnty>'
-        xml += '</dimensns>'
-        xml += '<fileType>socrata</fileType>'
-        xml += '</fileTxt>'
-        xml += '</fileDscr>'
+        fileTxt = _sub(_sub(codebook, "fileDscr", {"ID": "F1"}), "fileTxt")
+        _sub(fileTxt, "fileName").text = self.name
+        dimensns = _sub(fileTxt, "dimensns")
+        _sub(dimensns, "caseQnty").text = str(self.get_record_count())
+        _sub(dimensns, "varQnty").text = str(self.get_variable_count())
+        _sub(fileTxt, "fileType").text = "socrata"
         # dataDscr
-        xml += '<dataDscr>'
-        for var in self.variables:
-            if var.is_hidden:
-                continue
-            xml += f'<var ID="V{var.id}" name="{var.name}" files="F1">'
-            xml += f'<labl>{escape(var.label)}</labl>'
-            if var.socrata_data_type == 'number':
+        dataDscr = _sub(codebook, "dataDscr")
+        for column, name, label, data_type, cached in self._iter_visible_columns():
+            var = _sub(dataDscr, "var", {"ID": f"V{column.id}", "name": name, "files": "F1"})
+            _sub(var, "labl").text = label
+            if data_type == 'number':
                 type = 'numeric'
             else:
                 type = 'character'
-            if var.cached_content:
+            if cached:
                 # summary statistics
-                xml += f'<sumStat type="other" otherType="count">{var.count}</sumStat>' if var.count else ''
-                xml += f'<sumStat type="min">{escape(var.smallest)}</sumStat>' if var.smallest else ''
-                xml += f'<sumStat type="max">{escape(var.largest)}</sumStat>' if var.largest else ''
-                xml += f'<sumStat type="other" otherType="cardinality">{var.cardinality}</sumStat>' if var.cardinality else ''
-                xml += f'<sumStat type="vald">{var.non_null}</sumStat>' if var.non_null else ''
-                xml += f'<sumStat type="invd">{var.null}</sumStat>' if var.null else ''
-                if var.top and var.cardinality <=  category_count_threshold:
-                    for item in var.top:
-                        xml += '<catgry>'
-                        xml += f'<catValu>{escape(str(item["item"]))}</catValu>'
-                        xml += f'<labl>{escape(str(item["item"]))}</labl>' # Socrata does not provide category labels. Use code value.
-                        xml += f'<catStat type="freq">{item["count"]}</catStat>'
-                        xml += '</catgry>'                    
-            xml += f'<varFormat type="{type}" schema="other" formatname="socrata">{var.socrata_data_type}</varFormat>'
-            xml += '</var>'
-        xml += '<notes type="dartfx" subject="variables">Be wary that Socrata does not provide category labels and by default only lists information on the top/most used codes. The DDI var/catgry sets may therefore be incomplete.</notes>'
-        xml += '</dataDscr>'
-        xml += '</codeBook>'
-        return xml
+                if cached.count:
+                    _sub(var, "sumStat", {"type": "other", "otherType": "count"}).text = str(cached.count)
+                if cached.smallest:
+                    _sub(var, "sumStat", {"type": "min"}).text = str(cached.smallest)
+                if cached.largest:
+                    _sub(var, "sumStat", {"type": "max"}).text = str(cached.largest)
+                if cached.cardinality:
+                    _sub(var, "sumStat", {"type": "other", "otherType": "cardinality"}).text = str(cached.cardinality)
+                if cached.non_null:
+                    _sub(var, "sumStat", {"type": "vald"}).text = str(cached.non_null)
+                if cached.null:
+                    _sub(var, "sumStat", {"type": "invd"}).text = str(cached.null)
+                if cached.top and cached.cardinality <=  category_count_threshold:
+                    # Socrata does not provide category labels. Use code value.
+                    for item in cached.top:
+                        value = str(item["item"])
+                        catgry = _sub(var, "catgry")
+                        _sub(catgry, "catValu").text = value
+                        _sub(catgry, "labl").text = value
+                        _sub(catgry, "catStat", {"type": "freq"}).text = str(item["count"])
+            _sub(var, "varFormat", {"type": type, "schema": "other", "formatname": "socrata"}).text = data_type
+        _sub(dataDscr, "notes", {"type": "dartfx", "subject": "variables"}).text = "Be wary that Socrata does not provide category labels and by default only lists information on the top/most used codes. The DDI var/catgry sets may therefore be incomplete."
+        return codebook
 
     def get_variable_count(self, exclude_hidden=True, exclude_deleted=True, exclude_computed=True) -> int:
-        count = 0
-        for variable in self.variables:
-            if variable.is_hidden and exclude_hidden:
-                continue
-            else:
-                if variable.is_deleted and exclude_deleted:
-                    continue
-                if variable.is_computed and exclude_computed:
-                    continue
-            count += 1
-        return count
-    
+        return sum(self._get_variable_mask(exclude_hidden, exclude_deleted, exclude_computed))
+
     def get_variables(self, exclude_hidden=True, exclude_deleted=True, exclude_computed=True) -> list["SocrataVariable"]:
         """Helper function for getting a list of variables based on visibility attributes."""
-        variables = []
-        for variable in self.variables:
-            if variable.is_hidden and exclude_hidden:
-                continue
-            else:
-                if variable.is_deleted and exclude_deleted:
-                    continue
-                if variable.is_computed and exclude_computed:
-                    continue
-            variables.append(variable)
-        return variables
+        return list(compress(self.variables, self._get_variable_mask(exclude_hidden, exclude_deleted, exclude_computed)))
+
+    def _iter_visible_columns(self):
+        # yields (column, name, label, data_type, cached_contents) for the columns that are not hidden,
+        # reading the column lists directly instead of creating SocrataVariable wrappers
+        columns = zip(self._view.columns, self._col_name, self._col_label, self._col_type, self._col_cached)
+        visible = [not hidden for hidden in self._is_hidden]
+        yield from compress(columns, visible)
+
+    def _get_variable_mask(self, exclude_hidden=True, exclude_deleted=True, exclude_computed=True) -> list[bool]:
+        # True for the variables to include, based on the precomputed visibility masks
+        return [
+            not ((hidden and exclude_hidden) or (deleted and exclude_deleted) or (computed and exclude_computed))
+            for hidden, deleted, computed in zip(self._is_hidden, self._is_deleted, self._is_computed)
+        ]
     
     def get_visible_variables(self) -> list["SocrataVariable"]:
         """Helper to get a list of the visible variables."""
@@ -527,63 +896,67 @@ class SocrataDataset(BaseModel):
         return names
 
     def get_markdown(self, sections=[]):
-        md = f"# {markdownify(self.name)}\n\n"
+        md = f"# {self.name_md}\n\n"
         if not sections or 'links' in sections:
             md += f"###### [View online]({self.landing_page})\n\n"
         if self.description:
-            md += f"{markdownify(self.description)}\n\n"
+            md += f"{self.description_md}\n\n"
         if not sections or 'variables' in sections:
             md += "\n## Variables\n\n"
             md += "| Name | Label | Type | Info |\n"
             md += "|---|---|---|---|\n"
-            for variable in self.variables:
-                if variable.is_hidden:
-                    continue
-                md += f"| {variable.name} | {variable.label} | {variable.socrata_data_type}"
+            rows = []
+            for _, name, label, data_type, cached in self._iter_visible_columns():
                 info = ""
-                if variable.cardinality:
-                    info += f"Cardinality: {variable.cardinality:,}"
-                if variable.top:
-                    values = []
-                    for entry in variable.top[:3]:
-                        values.append(str(entry.get("item")))
+                if cached and cached.cardinality:
+                    info += f"Cardinality: {cached.cardinality:,}"
+                if cached and cached.top:
                     if info:
                         info += "<br/>"
-                    info += f"Examples: {', '.join(values)}"
+                    info += f"Examples: {', '.join([str(entry.get('item')) for entry in cached.top[:3]])}"
                 if not info:
                     info = "-"
-                md += f" | {info} |\n"
+                rows.append(f"| {name} | {label} | {data_type} | {info} |\n")
+            md += ''.join(rows)
         return md
 
     def get_record_count(self):
-        variable0 = self.variables[0]
-        if variable0.cached_content:
-            count = variable0.cached_content.get("count")
-            return count
+        # read the first column statistics directly, without building the variables
+        cached = self._col_cached[0] if self._col_cached else None
+        if cached:
+            return cached.count
 
-class SocrataVariable(BaseModel):
+@dataclass(slots=True)
+class SocrataVariable:
     """Helper class to process/use Socrata dataset variables (columns).
 
     This uses a standard terminology and hides Socrata proprietary attribute names.
+    This is a lightweight view over a dataset column, attributes are read from the
+    dataset's column lists.
 
     """
     dataset: SocrataDataset
     index: int
 
     @property
-    def cached_content(self):
-        return self.data.get('cachedContents')
+    def cached_content(self) -> SocrataCachedContents|None:
+        return self.dataset._col_cached[self.index]
 
     @property
     def cardinality(self):
-        if self.cached_content and self.cached_content.get('cardinality'):
-            return int(self.cached_content.get('cardinality'))
+        if self.cached_content:
+            return self.cached_content.cardinality
+
 
+    @property
+    def column(self) -> SocrataColumn:
+        """The typed column metadata"""
+        return self.dataset._view.columns[self.index]
 
     @property
     def count(self):
-        if self.cached_content and self.cached_content.get('count'):
-            return int(self.cached_content.get('count'))
+        if self.cached_content:
+            return self.cached_content.count
 
     @property
     def croissant_data_type(self):
@@ -605,22 +978,22 @@ class SocrataVariable(BaseModel):
     @property
     def id(self):
         """The variable is which is always a number"""
-        return self.data["id"]
+        return self.column.id
 
     @property
     def is_computed(self):
         """The name, which is the 'fieldname' property, starts with ':@computed'"""
-        return self.name.startswith(":@computed")
+        return self.dataset._is_computed[self.index]
 
     @property
     def is_deleted(self):
         """The label, which is the 'name' property, starts with 'DELETE -'"""
-        return self.label.startswith("DELETE -")
+        return self.dataset._is_deleted[self.index]
 
     @property
     def is_hidden(self):
         """Is either computed or deleted"""
-        return self.is_computed or self.is_deleted
+        return self.dataset._is_hidden[self.index]
 
     @property
     def is_visible(self):
@@ -631,41 +1004,41 @@ class SocrataVariable(BaseModel):
     def label(self):
         # Note that the 'name' property is actually the variable label
         # Be aware that variables marked for deletion, that are hidden from users, have a 'name' that starts with 'DELETE -'
-        return self.data["name"]
+        return self.dataset._col_label[self.index]
 
     @property
     def largest(self):
         if self.cached_content:
-            return self.cached_content.get('largest')
+            return self.cached_content.largest
 
     @property
     def name(self):
         # Note that the 'filedName' property is actually the variable name
         # Be aware that compute variables, that are hidden from users, start with :@computed
-        return self.data["fieldName"]
+        return self.dataset._col_name[self.index]
 
     @property
     def non_null(self):
-        if self.cached_content and self.cached_content.get('non_null'):
-            return int(self.cached_content.get('non_null'))
+        if self.cached_content:
+            return self.cached_content.non_null
 
     @property
     def null(self):
-        if self.cached_content and self.cached_content.get('null'):
-            return int(self.cached_content.get('null'))
+        if self.cached_content:
+            return self.cached_content.null
 
     @property
     def position(self):
-        return self.data["position"]
+        return self.column.position
 
     @property
     def smallest(self):
         if self.cached_content:
-            return self.cached_content.get('smallest')
+            return self.cached_content.smallest
 
     @property
     def socrata_data_type(self):
-        return self.data["dataTypeName"]
+        return self.dataset._col_type[self.index]
 
     @property
     def generic_data_type(self):
@@ -674,10 +1047,10 @@ class SocrataVariable(BaseModel):
         
     @property
     def socrata_render_type(self):
-        return self.data["renderTypeName"]
+        return self.column.render_type_name
 
 
     @property
     def top(self):
-        if self.cached_content and self.cached_content.get('top'):
-            return self.cached_content.get('top')
+        if self.cached_content and self.cached_content.top:
+            return self.cached_content.top
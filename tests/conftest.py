@@ -1,8 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from dartfx.socrata import SocrataServer, SocrataDataset
 from dotenv import load_dotenv
 from pathlib import Path
+import os
 import pytest
 
+# datasets used by the tests: fixture name -> (server host, dataset id)
+TEST_DATASETS = {
+    "sfo_dataset_311": ("data.sfgov.org", "vw6y-z8j6"),
+    "sfo_dataset_police": ("data.sfgov.org", "wg3w-h783"),
+    "nyc_dataset_311": ("data.cityofnewyork.us", "vfnx-vebw"),
+}
+
 @pytest.fixture(scope="session", autouse=True)
 def load_env():
     dotenv_path = Path(__file__).parent / "../.env"  # Construct path from current test file dir
@@ -11,4 +20,73 @@ def load_env():
 @pytest.fixture(scope="session")
 def tests_dir():
     return Path(__file__).parent
-    
+
+@pytest.fixture(scope="session")
+def save_output(tests_dir):
+    """Returns a function writing a test output file in the tests directory.
+
+    The content is written in one buffered write to a temporary file which then
+    replaces the output, so an interrupted run never leaves a partial file.
+    """
+    def save(filename, content):
+        path = tests_dir / filename
+        tmp_path = path.with_name(path.name + ".tmp")
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        with open(tmp_path, "wb", buffering=1 << 20) as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return save
+
+@pytest.fixture(scope="session")
+def ddi_schema(tests_dir):
+    """The DDI-Codebook 2.5 XML schema, compiled once per test session."""
+    from lxml import etree as ET
+    xml_schema_doc = ET.parse(str(tests_dir / 'ddi_2_5_1' / 'schemas' / 'codebook.xsd'))
+    xml_schema = ET.XMLSchema(xml_schema_doc)
+    return xml_schema
+
+@pytest.fixture(scope="session")
+def socrata_cache_dir(tests_dir):
+    """The disk cache shared by the test servers across runs (not versioned)."""
+    cache_dir = tests_dir / ".socrata_cache"
+    cache_dir.mkdir(exist_ok=True)
+    return cache_dir
+
+@pytest.fixture(scope="session")
+def socrata_servers(request, socrata_cache_dir):
+    """The test servers by host, with the metadata of the datasets used by the selected tests prefetched concurrently.
+
+    Metadata is cached on disk, set SOCRATA_OFFLINE to only use the cache (e.g. on CI with a warm cache).
+    """
+    offline = bool(os.environ.get("SOCRATA_OFFLINE"))
+    servers = {host: SocrataServer(host=host, disk_cache_root=str(socrata_cache_dir), offline=offline) for host, _ in TEST_DATASETS.values()}
+    used = {name for item in request.session.items for name in getattr(item, "fixturenames", ())}
+    prefetch = {}
+    for name, (host, dataset_id) in TEST_DATASETS.items():
+        if name in used:
+            prefetch.setdefault(host, []).append(dataset_id)
+    if prefetch:
+        with ThreadPoolExecutor(max_workers=len(prefetch)) as executor:
+            list(executor.map(lambda host: servers[host].get_dataset_infos(prefetch[host]), prefetch))
+    return servers
+
+@pytest.fixture(scope="session")
+def sfo_server(socrata_servers):
+    return socrata_servers["data.sfgov.org"]
+
+@pytest.fixture(scope="session")
+def nyc_server(socrata_servers):
+    return socrata_servers["data.cityofnewyork.us"]
+
+@pytest.fixture(scope="session")
+def sfo_dataset_311(sfo_server):
+    return SocrataDataset(server=sfo_server, id="vw6y-z8j6")
+
+@pytest.fixture(scope="session")
+def sfo_dataset_police(sfo_server):
+    return SocrataDataset(server=sfo_server, id="wg3w-h783")
+
+@pytest.fixture(scope="session")
+def nyc_dataset_311(nyc_server):
+    return SocrataDataset(server=nyc_server, id="vfnx-vebw")
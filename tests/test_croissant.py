@@ -1,15 +1,16 @@
 
 import json
 import os
-from dartfx.socrata import SocrataServer, SocrataDataset
 
-sfo_server = SocrataServer(host="data.sfgov.org")
-sfo_dataset_311 = SocrataDataset(server=sfo_server, id="vw6y-z8j6")
+# set PRETTY_JSON to indent the saved Croissant files for inspection
+PRETTY_JSON = bool(os.environ.get("PRETTY_JSON"))
 
-nyc_server= SocrataServer(host="data.cityofnewyork.us")
-nyc_dataset_311 = SocrataDataset(server=nyc_server, id="vfnx-vebw")
+def to_json(data) -> str:
+    if PRETTY_JSON:
+        return json.dumps(data, indent=4, default=str)
+    return json.dumps(data, separators=(",", ":"), default=str)
 
-def test_sfo_311(tests_dir):
+def test_sfo_311(save_output, sfo_dataset_311):
     metadata = sfo_dataset_311.get_croissant(max_codes=10)
     assert metadata
     assert metadata.name == sfo_dataset_311.name, "Metadata name doesn't match dataset name"
@@ -22,11 +23,10 @@ def test_sfo_311(tests_dir):
     # Verify record sets exist
     assert len(metadata.record_sets) > 0, "No record sets found"
     
-    with open(os.path.join(tests_dir, "sfo_311.croissant.json"), "w") as f:
-        json.dump(metadata.to_json(), f, indent=4, default=str)
+    save_output("sfo_311.croissant.json", to_json(metadata.to_json()))
     print(metadata.issues.report())
 
-def test_nyc_311(tests_dir):
+def test_nyc_311(save_output, nyc_dataset_311):
     metadata = nyc_dataset_311.get_croissant(include_codes=False) # test no codes
     assert metadata
     assert metadata.name == nyc_dataset_311.name, "Metadata name doesn't match dataset name"
@@ -34,6 +34,5 @@ def test_nyc_311(tests_dir):
     # When include_codes=False, should only have the main data record set
     assert len(metadata.record_sets) == 1, f"Expected 1 record set, got {len(metadata.record_sets)}"
     
-    with open(os.path.join(tests_dir, "nyc_311.croissant.json"), "w") as f:
-        json.dump(metadata.to_json(), f, indent=4, default=str)
+    save_output("nyc_311.croissant.json", to_json(metadata.to_json()))
     print(metadata.issues.report())
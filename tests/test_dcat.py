@@ -1,14 +1,30 @@
-import os
+import asyncio
+import io
+import json
+import pytest
 from pathlib import Path
 from rdflib import Graph, DCAT, DCTERMS, FOAF, URIRef
-from dartfx.socrata import SocrataServer, SocrataDataset, DcatGenerator
+from rdflib.compare import isomorphic
+from dartfx.socrata import SocrataDataset, SocrataServer, DcatGenerator
+from dartfx.socrata import dcat
+from .test_server import FakeAsyncSession, FakeSession, HOST, VIEW
 
-sfo_server = SocrataServer(host="data.sfgov.org")
-sfo_dataset_311 = SocrataDataset(server=sfo_server, id="vw6y-z8j6")
-# A second dataset for testing multiple datasets in a catalog
-sfo_dataset_police = SocrataDataset(server=sfo_server, id="wg3w-h783")
+ASYNC_IDS = ["aaaa-0001", "aaaa-0002", "aaaa-0003"]
 
-def test_sfo_311(tests_dir: Path):
+@pytest.fixture
+def fake_client_session(monkeypatch):
+    """Replaces the aiohttp session and connector used by DcatGenerator, recording their arguments."""
+    pytest.importorskip("aiohttp")
+    session = FakeAsyncSession(*[(200, json.dumps({**VIEW, "id": dataset_id}).encode(), {}) for dataset_id in ASYNC_IDS])
+    session.arguments = {}
+    def client_session(**kwargs):
+        session.arguments.update(kwargs)
+        return session
+    monkeypatch.setattr(dcat.aiohttp, "ClientSession", client_session)
+    monkeypatch.setattr(dcat.aiohttp, "TCPConnector", lambda **kwargs: kwargs)
+    return session
+
+def test_sfo_311(save_output, sfo_server, sfo_dataset_311):
     generator = DcatGenerator(sfo_server)
     generator.add_dataset(sfo_dataset_311)
     
@@ -40,9 +56,9 @@ def test_sfo_311(tests_dir: Path):
     assert (svc_uri, DCAT.endpointURL, svc_uri) in g
     
     # Save for manual inspection
-    g.serialize(destination=os.path.join(tests_dir, "sfo_311.dcat.ttl"), format="ttl")
+    save_output("sfo_311.dcat.ttl", g.serialize(format="ttl"))
 
-def test_multi_dataset(tests_dir: Path):
+def test_multi_dataset(tests_dir: Path, sfo_server, sfo_dataset_311, sfo_dataset_police):
     generator = DcatGenerator(sfo_server)
     generator.add_datasets([sfo_dataset_311, sfo_dataset_police])
     
@@ -59,3 +75,83 @@ def test_multi_dataset(tests_dir: Path):
     for ds in datasets:
         assert (ds, DCTERMS.title, None) in g
 
+
+def test_dataset_ids(sfo_server, sfo_dataset_311, sfo_dataset_police):
+    generator = DcatGenerator(sfo_server, [sfo_dataset_311.id, sfo_dataset_police], max_workers=2)
+    
+    assert [ds.id for ds in generator.datasets] == [sfo_dataset_311.id, sfo_dataset_police.id]
+    assert all(isinstance(ds, SocrataDataset) for ds in generator.datasets)
+
+def test_write_nt(sfo_server, sfo_dataset_311, sfo_dataset_police):
+    generator = DcatGenerator(sfo_server, [sfo_dataset_311, sfo_dataset_police])
+    
+    buffer = io.BytesIO()
+    generator.write_nt(buffer)
+    g = Graph().parse(data=buffer.getvalue(), format="nt")
+    
+    assert isomorphic(g, generator.get_graph())
+
+def test_serialize_ttl(sfo_server, sfo_dataset_311, sfo_dataset_police):
+    generator = DcatGenerator(sfo_server, [sfo_dataset_311, sfo_dataset_police])
+    
+    g = Graph().parse(data=generator.serialize_ttl(), format="ttl")
+    
+    assert isomorphic(g, generator.get_graph())
+
+def test_count_triples(sfo_server, sfo_dataset_311, sfo_dataset_police):
+    generator = DcatGenerator(sfo_server, [sfo_dataset_311, sfo_dataset_police])
+    
+    assert generator.count_triples() == len(generator.get_graph())
+    assert len(Graph().parse(data=generator.to_bytes(), format="nt")) == generator.count_triples()
+
+def test_update_graph(sfo_server, sfo_dataset_311, sfo_dataset_police):
+    generator = DcatGenerator(sfo_server, [sfo_dataset_311, sfo_dataset_police])
+    g = generator.get_graph()
+    expected = generator.get_graph()
+    
+    generator.update_graph(g, [sfo_dataset_311.id])
+    
+    assert isomorphic(g, expected)
+    assert generator.datasets[0] is not sfo_dataset_311
+
+def test_add_datasets_iterator(sfo_server, sfo_dataset_311, sfo_dataset_police):
+    generator = DcatGenerator(sfo_server)
+    generator.add_datasets(iter([sfo_dataset_311, sfo_dataset_police]))
+    assert generator.datasets == [sfo_dataset_311, sfo_dataset_police]
+
+def test_update_graph_changed():
+    changed = {**VIEW, "name": "Renamed view", "tags": ["new"]}
+    server = SocrataServer(host=HOST, cache_max_items=0)
+    server._session = FakeSession((200, json.dumps(VIEW).encode(), {}), (200, json.dumps(changed).encode(), {}))
+    generator = DcatGenerator(server, [VIEW["id"]])
+    g = generator.get_graph()
+    
+    generator.update_graph(g, [VIEW["id"]])
+    
+    assert generator.datasets[0].name == "Renamed view"
+    assert isomorphic(g, generator.get_graph())
+    assert not server._session.responses
+
+def test_add_datasets_async(fake_client_session):
+    generator = DcatGenerator(SocrataServer(host=HOST, timeout=12))
+    asyncio.run(generator.add_datasets_async(ASYNC_IDS, per_host_limit=1))
+    
+    assert [ds.id for ds in generator.datasets] == ASYNC_IDS
+    assert fake_client_session.arguments["timeout"].total == 12
+    assert fake_client_session.arguments["connector"]["limit_per_host"] == 1
+    assert fake_client_session.max_in_flight == 1
+
+def test_build_graph_async(fake_client_session):
+    generator = DcatGenerator(SocrataServer(host=HOST))
+    g = asyncio.run(generator.build_graph_async(ASYNC_IDS, per_host_limit=2))
+    
+    assert isomorphic(g, generator.get_graph())
+    assert fake_client_session.arguments["timeout"].total == generator.server.timeout
+    assert fake_client_session.max_in_flight == 2
+
+def test_count_triples_shared():
+    server = SocrataServer(host=HOST)
+    server._session = FakeSession(*[(200, json.dumps({**VIEW, "id": dataset_id}).encode(), {}) for dataset_id in ASYNC_IDS])
+    generator = DcatGenerator(server, ASYNC_IDS, max_workers=1)
+    
+    assert generator.count_triples() == len(generator.get_graph())
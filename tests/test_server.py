@@ -0,0 +1,173 @@
+import asyncio
+import copy
+import io
+import json
+import pickle
+import pytest
+import requests
+from dartfx.socrata import SocrataApiError, SocrataDataset, SocrataServer
+from dartfx.socrata.socrata import _atomic_open
+
+HOST = "data.sfgov.org"
+VIEW = {"id": "abcd-1234", "name": "Cached view", "assetType": "dataset", "columns": []}
+
+class FakeSession:
+    """Stands in for the server requests.Session, replaying the given responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, headers))
+        status_code, body, response_headers = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(response_headers)
+        response.raw = io.BytesIO(body)
+        return response
+
+class FakeAsyncResponse:
+    def __init__(self, session, status, body, headers):
+        self.session = session
+        self.status = status
+        self.body = body
+        self.headers = headers
+
+    async def __aenter__(self):
+        # track the requests in flight, and let the other tasks run
+        self.session.in_flight += 1
+        self.session.max_in_flight = max(self.session.max_in_flight, self.session.in_flight)
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.session.in_flight -= 1
+        return False
+
+    async def read(self):
+        return self.body
+
+    async def text(self):
+        return self.body.decode()
+
+class FakeAsyncSession(FakeSession):
+    """Stands in for an aiohttp.ClientSession, replaying the given responses."""
+
+    def __init__(self, *responses):
+        super().__init__(*responses)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, headers))
+        return FakeAsyncResponse(self, *self.responses.pop(0))
+
+@pytest.fixture
+def cache_root(tmp_path):
+    """A disk cache root holding the test view."""
+    (tmp_path / HOST).mkdir()
+    (tmp_path / HOST / f"{VIEW['id']}.json").write_text(json.dumps(VIEW))
+    return tmp_path
+
+def test_offline_cache_hit(cache_root):
+    server = SocrataServer(host=HOST, disk_cache_root=str(cache_root), offline=True)
+    assert server.get_dataset_info(VIEW["id"]) == VIEW
+    assert server.get_dataset_info(VIEW["id"], refresh=True) == VIEW
+
+def test_offline_cache_miss(cache_root):
+    server = SocrataServer(host=HOST, disk_cache_root=str(cache_root), offline=True)
+    with pytest.raises(SocrataApiError, match="not cached") as excinfo:
+        server.get_dataset_info("zzzz-9999")
+    assert excinfo.value.url == f"https://{HOST}/api/views/zzzz-9999.json"
+
+def test_offline_search(cache_root):
+    server = SocrataServer(host=HOST, disk_cache_root=str(cache_root), offline=True)
+    with pytest.raises(SocrataApiError, match="offline"):
+        server.search_datasets(limit=1)
+
+def test_memory_cache_lru(cache_root):
+    for dataset_id in ("aaaa-0001", "aaaa-0002"):
+        (cache_root / HOST / f"{dataset_id}.json").write_text(json.dumps({**VIEW, "id": dataset_id}))
+    server = SocrataServer(host=HOST, disk_cache_root=str(cache_root), offline=True, cache_max_items=2)
+    server.get_dataset_info(VIEW["id"])
+    server.get_dataset_info("aaaa-0001")
+    server.get_dataset_info(VIEW["id"]) # most recently used again
+    server.get_dataset_info("aaaa-0002") # evicts aaaa-0001
+    assert list(server.memory_cache) == [VIEW["id"], "aaaa-0002"]
+
+def test_memory_cache_compress(cache_root):
+    view = {**VIEW, "id": "bbbb-0001", "description": "x" * 20000}
+    (cache_root / HOST / "bbbb-0001.json").write_text(json.dumps(view))
+    server = SocrataServer(host=HOST, disk_cache_root=str(cache_root), offline=True, cache_compress=True)
+    assert server.get_dataset_info("bbbb-0001") == view
+    assert isinstance(server.memory_cache["bbbb-0001"], bytes)
+    assert server.get_dataset_info("bbbb-0001") == view # from the memory cache
+    # small entries are kept as is
+    server.get_dataset_info(VIEW["id"])
+    assert server.memory_cache[VIEW["id"]] == VIEW
+
+def test_disk_cache_revalidate(tmp_path):
+    validators = {"ETag": '"v1"', "Last-Modified": "Tue, 13 Oct 2026 10:00:00 GMT"}
+    session = FakeSession((200, json.dumps(VIEW).encode(), validators), (304, b"", {}))
+    # first retrieval saves the view and its validators
+    server = SocrataServer(host=HOST, disk_cache_root=str(tmp_path), disk_cache_revalidate=True)
+    server._session = session
+    assert server.get_dataset_info(VIEW["id"]) == VIEW
+    assert json.loads((tmp_path / HOST / f"{VIEW['id']}.validators.json").read_text()) == validators
+    # a new server revalidates its disk cache entry and reloads it on 304
+    server = SocrataServer(host=HOST, disk_cache_root=str(tmp_path), disk_cache_revalidate=True)
+    server._session = session
+    assert server.get_dataset_info(VIEW["id"]) == VIEW
+    url, headers = session.requests[-1]
+    assert url == f"https://{HOST}/api/views/{VIEW['id']}.json"
+    assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": validators["Last-Modified"]}
+    assert not session.responses
+
+def test_aget_dataset_info_retry(tmp_path):
+    session = FakeAsyncSession((429, b"", {"Retry-After": "0"}), (200, json.dumps(VIEW).encode(), {}))
+    server = SocrataServer(host=HOST, disk_cache_root=str(tmp_path))
+    data = asyncio.run(server.aget_dataset_info(VIEW["id"], session, asyncio.Semaphore(1)))
+    assert data == VIEW
+    assert len(session.requests) == 2
+    # shares the disk cache with get_dataset_info
+    assert (tmp_path / HOST / f"{VIEW['id']}.json").is_file()
+
+def test_afetch_without_memory_cache():
+    session = FakeAsyncSession((200, json.dumps(VIEW).encode(), {}))
+    server = SocrataServer(host=HOST, cache_max_items=0)
+    server._session = FakeSession() # no blocking request expected
+    dataset = asyncio.run(SocrataDataset.afetch(server, VIEW["id"], session, asyncio.Semaphore(1)))
+    assert dataset.data == VIEW
+    assert dataset.name == VIEW["name"]
+    assert not server.memory_cache
+
+def test_copy_and_pickle(cache_root):
+    server = SocrataServer(host=HOST, disk_cache_root=str(cache_root), offline=True)
+    dataset = SocrataDataset(server=server, id=VIEW["id"])
+    for copied in (pickle.loads(pickle.dumps(dataset)), copy.deepcopy(dataset), dataset.model_copy(deep=True)):
+        assert copied.data == VIEW
+        assert copied.server.memory_cache == server.memory_cache
+        # each copy gets its own session and cache lock
+        assert copied.server._session is not server._session
+        assert copied.server._cache_lock is not server._cache_lock
+
+def test_server_equality():
+    assert SocrataServer(host=HOST) == SocrataServer(host=HOST)
+    assert SocrataServer(host=HOST) != SocrataServer(host=HOST, offline=True)
+
+def test_atomic_disk_cache_write(cache_root):
+    file_path = cache_root / HOST / f"{VIEW['id']}.json"
+    with pytest.raises(RuntimeError):
+        with _atomic_open(str(file_path)) as f:
+            f.write(b'{"id": "trunc')
+            raise RuntimeError("interrupted")
+    # the cached copy is intact and no temporary file is left
+    assert json.loads(file_path.read_text()) == VIEW
+    assert [path.name for path in (cache_root / HOST).iterdir()] == [file_path.name]